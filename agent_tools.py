@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+GAIA Agent Tool Factory
+Single place that assembles, shares and wraps the agent tool list
+"""
+
+import functools
+from smolagents import DuckDuckGoSearchTool, tool
+from tools import get_all_custom_tools, create_rate_limited_search, memoize_tool, get_webpage_fetcher, visit_webpages
+from gaia_regex import get_regex_tools
+
+# Shared singletons: the search tool holds an HTTP session, so every agent
+# reuses one instance (and one warm connection pool)
+@functools.lru_cache(maxsize=1)
+def _get_search_tool():
+    return DuckDuckGoSearchTool()
+
+@functools.lru_cache(maxsize=1)
+def _get_rate_limited_search_tool():
+    return tool(create_rate_limited_search(_get_search_tool()))
+
+def build_tool_list():
+    """Build the composed, wrapped tool list used by the GAIA agent
+
+    Returns:
+        List of tools (custom + regex helpers + search + web), with
+        memoization applied to the deterministic ones
+    """
+    tools = get_all_custom_tools() + get_regex_tools() + [
+        _get_rate_limited_search_tool(),
+        get_webpage_fetcher(),
+        visit_webpages,
+    ]
+    return [memoize_tool(t) for t in tools]
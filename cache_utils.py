@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+GAIA Cache Utilities
+Fast cache-key construction shared by the response, tool, search and plan caches
+"""
+
+import hashlib
+
+# orjson serializes several times faster than stdlib json; fall back
+# transparently when it isn't installed
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS, default=str)
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+
+def _sha256(data: bytes):
+    # These keys aren't cryptographic; usedforsecurity=False unlocks the
+    # fast OpenSSL path where available
+    try:
+        return hashlib.sha256(data, usedforsecurity=False)
+    except TypeError:
+        return hashlib.sha256(data)
+
+def hash_text(text: str) -> str:
+    """Hex digest for a plain string key
+
+    Args:
+        text: The string to hash
+    """
+    return _sha256(text.encode('utf-8')).hexdigest()
+
+def cache_key(**parts) -> str:
+    """Hex digest over keyword parts, canonically serialized
+
+    Args:
+        **parts: The components that identify the cached value
+    """
+    return _sha256(_dumps(parts)).hexdigest()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+GAIA Regex Helpers
+Precompiled patterns exposed as tools so the agent doesn't redeclare/recompile
+regexes inside every generated code block
+"""
+
+import re
+from smolagents import tool
+
+# Compiled once at import time
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+NUM_RE = re.compile(r'\d+(?:\.\d+)?')
+
+@tool
+def extract_links(text: str) -> str:
+    """Extract markdown links from text as 'title -> url' lines
+
+    Args:
+        text: The text (e.g. search results or page markdown) to scan
+    """
+    links = LINK_RE.findall(text)
+    if not links:
+        return "No links found"
+    return "\n".join(f"{title} -> {url}" for title, url in links)
+
+@tool
+def extract_years(text: str, lo: int = 1900, hi: int = 2099) -> str:
+    """Extract 4-digit years from text, in order of appearance
+
+    Args:
+        text: The text to scan for years
+        lo: Lowest year to include
+        hi: Highest year to include
+    """
+    years = [y for y in YEAR_RE.findall(text) if lo <= int(y) <= hi]
+    if not years:
+        return "No years found"
+    return ", ".join(years)
+
+@tool
+def extract_numbers(text: str) -> str:
+    """Extract numbers (integers and decimals) from text, in order of appearance
+
+    Args:
+        text: The text to scan for numbers
+    """
+    numbers = NUM_RE.findall(text)
+    if not numbers:
+        return "No numbers found"
+    return ", ".join(numbers)
+
+def get_regex_tools():
+    """Get the precompiled regex helper tools
+
+    Returns:
+        List of regex helper tools for the GAIA agent
+    """
+    return [extract_links, extract_years, extract_numbers]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+GAIA Plan Cache
+Exact-match answer cache plus per-template tool trajectories for recurring question shapes
+"""
+
+import re
+import json
+import time
+import sqlite3
+from cache_utils import hash_text
+
+# Strips the varying parts of a question (numbers, quoted strings) so
+# structurally identical questions share one template hash
+_TEMPLATE_VARIABLE_RE = re.compile(r'\d+|"[^"]*"|\'[^\']*\'')
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+def question_hash(question: str) -> str:
+    """Hash of the normalized question text (exact-match key)"""
+    return hash_text(_normalize(question))
+
+def template_hash(question: str) -> str:
+    """Hash of the question with numbers/quoted strings stripped (template key)"""
+    return hash_text(_TEMPLATE_VARIABLE_RE.sub('#', _normalize(question)))
+
+class PlanCache:
+    """Persistent cache of GAIA answers and tool-call trajectories
+
+    GAIA questions follow a small set of recurring templates. Two SQLite
+    tables back this up:
+    - answers: exact question hash -> final answer, so a repeated question
+      skips the whole agent loop
+    - plans: template hash -> the tool sequence that solved a question of
+      that shape, kept as a reusable prior for recurring templates
+    """
+
+    def __init__(self, path: str = ".plan_cache.sqlite"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers (question_hash TEXT PRIMARY KEY, answer TEXT, ts REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans (template_hash TEXT PRIMARY KEY, tool_sequence_json TEXT, ts REAL)"
+        )
+        self._conn.commit()
+
+    def get_answer(self, question: str):
+        """Get the cached final answer for an identical question, or None"""
+        row = self._conn.execute(
+            "SELECT answer FROM answers WHERE question_hash = ?", (question_hash(question),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_answer(self, question: str, answer: str):
+        """Store the final answer for a question"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO answers (question_hash, answer, ts) VALUES (?, ?, ?)",
+            (question_hash(question), answer, time.time())
+        )
+        self._conn.commit()
+
+    def get_plan(self, question: str):
+        """Get the tool sequence that solved a question of this shape, or None"""
+        row = self._conn.execute(
+            "SELECT tool_sequence_json FROM plans WHERE template_hash = ?", (template_hash(question),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_plan(self, question: str, tool_sequence):
+        """Store the tool sequence used to solve a question of this shape
+
+        Args:
+            question: The question text (hashed to its template)
+            tool_sequence: Ordered list of tool names the agent invoked
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO plans (template_hash, tool_sequence_json, ts) VALUES (?, ?, ?)",
+            (template_hash(question), json.dumps(tool_sequence), time.time())
+        )
+        self._conn.commit()
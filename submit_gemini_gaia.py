@@ -6,16 +6,179 @@ Runs Gemini-powered agent on all GAIA questions and submits to official API for
 
 import os
 import sys
+import gzip
 import requests
 import json
 import time
+import random
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Import the Gemini agent
-from agent_gemini import Agent
+# Groups each question's progress lines so parallel workers don't interleave
+_print_lock = threading.Lock()
 
 # API Configuration
 DEFAULT_API_URL = "https://agents-course-unit4-scoring.hf.space"
 
+# All HTTP traffic to the scoring API shares one pooled client, so the
+# questions fetch, file downloads and the final submit reuse TCP/TLS
+# connections instead of handshaking per request. httpx (with h2) adds
+# HTTP/2 multiplexing on top; requests stays as the fallback so the
+# script runs with the base requirements alone
+try:
+    import httpx
+    SESSION = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        headers={"Accept-Encoding": "gzip"},
+        timeout=30,
+    )
+    _TRANSIENT_EXCEPTIONS = (httpx.TransportError,)
+    _HTTP_STATUS_ERRORS = (httpx.HTTPStatusError,)
+    _TIMEOUT_ERRORS = (httpx.TimeoutException,)
+    _REQUEST_ERRORS = (httpx.HTTPError,)
+    _BODY_KWARG = "content"  # httpx reserves data= for form fields
+except ImportError:
+    SESSION = requests.Session()
+    SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32))
+    SESSION.headers.update({"Accept-Encoding": "gzip"})
+    _TRANSIENT_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    _HTTP_STATUS_ERRORS = (requests.exceptions.HTTPError,)
+    _TIMEOUT_ERRORS = (requests.exceptions.Timeout,)
+    _REQUEST_ERRORS = (requests.exceptions.RequestException,)
+    _BODY_KWARG = "data"
+
+# HTTP statuses worth retrying; 4xx other than 429 means the request itself
+# is wrong and retrying can't fix it
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+def _retry(fn, *args, max_retries=3, base=1.0, cap=30.0, **kwargs):
+    """Call an HTTP function with exponential backoff on transient failures
+
+    Args:
+        fn: The session method to call (e.g. SESSION.get)
+        *args: Positional arguments for fn
+        max_retries: Retries after the first attempt
+        base: Initial backoff in seconds (doubles per attempt)
+        cap: Maximum backoff in seconds
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        The response; the last attempt's response/exception propagates
+        unchanged so callers can keep their existing error handling
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = fn(*args, **kwargs)
+        except _TRANSIENT_EXCEPTIONS as e:
+            if attempt >= max_retries:
+                raise
+            reason = type(e).__name__
+        else:
+            if response.status_code not in _RETRYABLE_STATUSES or attempt >= max_retries:
+                return response
+            reason = f"HTTP {response.status_code}"
+        delay = min(cap, base * (2 ** attempt)) * (1 + random.random() * 0.5)
+        print(f"🔁 Transient error ({reason}), retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+# Per-question results stream here as JSON lines, so a crash loses at most
+# one answer and re-runs can resume instead of re-paying hours of agent time
+RESULTS_LOG_PATH = "results.ndjson"
+
+# orjson serializes to bytes several times faster; fall back to stdlib json
+try:
+    import orjson
+
+    # Native numpy/dataclass handling so agent results that aren't plain
+    # strings checkpoint without a pre-stringify pass; default=str still
+    # catches anything else
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SERIALIZE_DATACLASS
+
+    def _json_dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj, option=_ORJSON_OPTS, default=str)
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _json_dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, default=str).encode("utf-8")
+
+    def _json_loads(data):
+        return json.loads(data)
+
+class AnswerCache:
+    """Persistent task_id -> answer cache
+
+    GAIA task_ids are stable, so during development every re-run re-paid
+    the full agent pipeline for already-solved tasks. Cached answers are
+    reused across runs (independent of the per-run results log); pass
+    --no-cache to force fresh answers.
+    """
+
+    def __init__(self, path=".gaia_answers.sqlite"):
+        import sqlite3
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers (task_id TEXT PRIMARY KEY, answer TEXT, ts REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, task_id):
+        row = self._conn.execute(
+            "SELECT answer FROM answers WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, task_id, answer):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO answers (task_id, answer, ts) VALUES (?, ?, ?)",
+            (task_id, answer, time.time())
+        )
+        self._conn.commit()
+
+def _load_completed_results(path):
+    """Load previously completed results from the NDJSON log
+
+    Args:
+        path: Path to the results log
+
+    Returns:
+        Dict mapping task_id -> (answer_dict, result_dict) for finished tasks
+    """
+    completed = {}
+    if not os.path.exists(path):
+        return completed
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted write
+            task_id = record.get("task_id")
+            if not task_id:
+                continue
+            submitted = record.get("submitted_answer", "")
+            # Only genuinely solved tasks count as completed; failures are
+            # retried on resume instead of resubmitting their error strings
+            # (the prefix check also filters pre-fix logs where errors were
+            # logged with success=true)
+            if not record.get("success") or str(submitted).startswith(("Error", "ERROR")):
+                continue
+            answer = {"task_id": task_id, "submitted_answer": submitted}
+            entry = {key: record.get(key) for key in
+                     ("task_id", "question", "result", "result_str", "duration", "success", "error")}
+            if entry["result_str"] is None:
+                # Logs from before result_str existed: the submitted answer
+                # is the same stringification
+                entry["result_str"] = answer["submitted_answer"]
+            completed[task_id] = (answer, entry)
+    return completed
+
 # Stored credentials - no need to enter each time
 HF_USERNAME = "theguywithahat0"
 AGENT_CODE_URL = "https://github.com/theguywithahat0/hugging_face_agent_course"
@@ -38,9 +201,9 @@ def fetch_all_gaia_questions():
     print(f"📡 URL: {questions_url}")
     
     try:
-        response = requests.get(questions_url, timeout=30)
+        response = _retry(SESSION.get, questions_url, timeout=30)
         response.raise_for_status()
-        questions_data = response.json()
+        questions_data = _json_loads(response.content)
         
         if not questions_data:
             print("❌ No questions received from API")
@@ -49,93 +212,176 @@ def fetch_all_gaia_questions():
         print(f"✅ Successfully fetched {len(questions_data)} GAIA questions!")
         return questions_data
         
-    except requests.exceptions.RequestException as e:
+    except _REQUEST_ERRORS as e:
         print(f"❌ Error fetching questions: {e}")
         return []
     except json.JSONDecodeError as e:
         print(f"❌ Error decoding JSON response: {e}")
         return []
 
-def run_agent_on_all_questions(questions):
-    """Run our Gemini agent on all GAIA questions"""
-    print(f"\n🤖 Running Gemini GAIA Agent on {len(questions)} questions")
-    print("=" * 60)
-    
-    agent = Agent()
-    results = []
-    answers_payload = []
-    
-    for i, question_data in enumerate(questions):
-        task_id = question_data.get("task_id")
-        question_text = question_data.get("question")
-        file_name = question_data.get("file_name", "")
-        
-        if not task_id or question_text is None:
-            print(f"⚠️  Skipping question {i+1}: Missing task_id or question")
-            continue
-        
-        print(f"\n{'='*60}")
-        print(f"🎯 Question {i+1}/{len(questions)}")
-        print(f"📋 Task ID: {task_id}")
+def _solve_one(agent, question_data, idx, total):
+    """Run the agent on one GAIA question
+
+    Args:
+        agent: The shared Agent instance
+        question_data: Raw question dict from the API
+        idx: Zero-based question index (for progress output)
+        total: Total number of questions
+
+    Returns:
+        (answer_dict, result_dict) tuple, or None if the question is invalid
+    """
+    task_id = question_data.get("task_id")
+    question_text = question_data.get("question")
+    file_name = question_data.get("file_name", "")
+
+    if not task_id or question_text is None:
+        print(f"⚠️  Skipping question {idx+1}: Missing task_id or question")
+        return None
+
+    with _print_lock:
+        print(f"\n🎯 Question {idx+1}/{total} | 📋 Task ID: {task_id}")
         print(f"❓ Question: {question_text[:100]}{'...' if len(question_text) > 100 else ''}")
         if file_name:
             print(f"📁 File: {file_name}")
-        print(f"{'='*60}")
-        
-        # Create task in the format our agent expects
-        task = {
+
+    # Create task in the format our agent expects
+    task = {
+        "task_id": task_id,
+        "Question": question_text,
+        "file_name": file_name
+    }
+
+    start_time = time.time()
+    try:
+        result = agent.solve_task(task)
+        duration = time.time() - start_time
+        # Stringify once here; the analyzer reuses result_str instead of
+        # re-converting the result per statistic
+        result_str = result if isinstance(result, str) else str(result)
+        # solve_task reports its own failures as "Error: ..." strings;
+        # record those as failures so they are never cached as answers
+        solved = not result_str.startswith("Error")
+        answer = {"task_id": task_id, "submitted_answer": result_str}
+        entry = {
             "task_id": task_id,
-            "Question": question_text,
-            "file_name": file_name
+            "question": question_text,
+            "result": result,
+            "result_str": result_str,
+            "duration": duration,
+            "success": solved,
+            "error": None if solved else result_str
         }
-        
-        start_time = time.time()
-        try:
-            result = agent.solve_task(task)
-            duration = time.time() - start_time
-            
-            # Add to submission payload
-            answers_payload.append({
-                "task_id": task_id, 
-                "submitted_answer": str(result)
-            })
-            
-            # Add to results log
-            results.append({
-                "task_id": task_id,
-                "question": question_text,
-                "result": result,
-                "duration": duration,
-                "success": True,
-                "error": None
-            })
-            
-            print(f"✅ Result: {result}")
+        with _print_lock:
+            print(f"{'✅' if solved else '❌'} Result: {result}")
             print(f"⏱️  Duration: {duration:.1f}s")
-            
-        except Exception as e:
-            duration = time.time() - start_time
-            error_msg = str(e)
-            
-            # Still add to submission payload with error
-            answers_payload.append({
-                "task_id": task_id,
-                "submitted_answer": f"ERROR: {error_msg}"
-            })
-            
-            # Add to results log
-            results.append({
-                "task_id": task_id,
-                "question": question_text,
-                "result": None,
-                "duration": duration,
-                "success": False,
-                "error": error_msg
-            })
-            
+
+    except Exception as e:
+        duration = time.time() - start_time
+        error_msg = str(e)
+        # Still submit something for this task so the run counts it
+        answer = {"task_id": task_id, "submitted_answer": f"ERROR: {error_msg}"}
+        entry = {
+            "task_id": task_id,
+            "question": question_text,
+            "result": None,
+            "result_str": "",
+            "duration": duration,
+            "success": False,
+            "error": error_msg
+        }
+        with _print_lock:
             print(f"❌ Error: {error_msg}")
             print(f"⏱️  Duration: {duration:.1f}s")
-    
+
+    return answer, entry
+
+def run_agent_on_all_questions(questions):
+    """Run our Gemini agent on all GAIA questions
+
+    Questions run through a thread pool (GAIA_PARALLEL workers, default 4):
+    each agent loop is dominated by LLM/network waits, so wall-clock time
+    scales down roughly with the worker count. Results keep question order.
+    """
+    max_workers = max(1, int(os.environ.get("GAIA_PARALLEL", "4")))
+    print(f"\n🤖 Running Gemini GAIA Agent on {len(questions)} questions ({max_workers} workers)")
+    print("=" * 60)
+
+    # Resume: answers already on disk from a previous (crashed) run are reused
+    completed = _load_completed_results(RESULTS_LOG_PATH)
+    if completed:
+        print(f"💾 Resuming: {len(completed)} answers loaded from {RESULTS_LOG_PATH}")
+
+    # Cross-run answer cache (development iteration); --no-cache bypasses it
+    use_answer_cache = "--no-cache" not in sys.argv
+    answer_cache = AnswerCache() if use_answer_cache else None
+    if answer_cache is not None:
+        for question_data in questions:
+            task_id = question_data.get("task_id")
+            if not task_id or task_id in completed:
+                continue
+            cached = answer_cache.get(task_id)
+            if cached is not None:
+                completed[task_id] = (
+                    {"task_id": task_id, "submitted_answer": cached},
+                    {
+                        "task_id": task_id,
+                        "question": question_data.get("question"),
+                        "result": cached,
+                        "result_str": cached,
+                        "duration": 0.0,
+                        "success": True,
+                        "error": None
+                    },
+                )
+        cached_count = sum(1 for q in questions if q.get("task_id") in completed)
+        if cached_count:
+            print(f"♻️  {cached_count} answers available without running the agent")
+
+    # Imported here, not at module top: the agent pulls in smolagents and
+    # friends, which aborted runs (no questions, bad credentials) never need
+    from agent_gemini import Agent
+    agent = Agent()
+    results = []
+    answers_payload = []
+    collected = {}
+
+    with open(RESULTS_LOG_PATH, "ab") as log_file:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for i, question_data in enumerate(questions):
+                task_id = question_data.get("task_id")
+                if task_id in completed:
+                    collected[i] = completed[task_id]
+                    continue
+                # Each worker runs in its own context snapshot so the
+                # ContextVar-based task context in tools.py stays isolated
+                ctx = contextvars.copy_context()
+                futures[executor.submit(ctx.run, _solve_one, agent, question_data, i, len(questions))] = i
+            for future in as_completed(futures):
+                pair = future.result()
+                if pair is None:
+                    continue
+                collected[futures[future]] = pair
+                # Append the finished answer immediately: a crash now loses
+                # at most the tasks still in flight
+                answer, entry = pair
+                record = dict(entry)
+                record["submitted_answer"] = answer["submitted_answer"]
+                log_file.write(_json_dumps_bytes(record) + b"\n")
+                log_file.flush()
+                # Push the record through the OS cache too: each line costs
+                # an fsync but survives a machine crash, not just ours
+                os.fsync(log_file.fileno())
+                if (answer_cache is not None and entry["success"]
+                        and not answer["submitted_answer"].startswith(("Error", "ERROR"))):
+                    answer_cache.set(entry["task_id"], answer["submitted_answer"])
+
+    for idx in sorted(collected):
+        answer, entry = collected[idx]
+        answers_payload.append(answer)
+        results.append(entry)
+
     return results, answers_payload
 
 def analyze_local_results(results):
@@ -143,35 +389,49 @@ def analyze_local_results(results):
     print(f"\n📊 LOCAL RESULTS ANALYSIS")
     print("=" * 50)
     
+    # Single pass over results: success/error counts, answer-length stats
+    # (shorter is usually better for GAIA) and the concise-answer count
     total_questions = len(results)
-    successful_answers = len([r for r in results if r["success"]])
+    successful_answers = 0
+    answered = 0
+    length_sum = 0
+    min_length = None
+    max_length = 0
+    concise_answers = 0
+
+    for result in results:
+        if not result["success"]:
+            continue
+        successful_answers += 1
+        if result["result_str"]:
+            length = len(result["result_str"])
+            answered += 1
+            length_sum += length
+            max_length = max(max_length, length)
+            min_length = length if min_length is None else min(min_length, length)
+            if length <= 20:
+                concise_answers += 1
+
     error_count = total_questions - successful_answers
-    
+
     print(f"📝 Total Questions: {total_questions}")
     print(f"✅ Successful Answers: {successful_answers}")
     print(f"❌ Errors: {error_count}")
-    print(f"📊 Success Rate: {(successful_answers/total_questions)*100:.1f}%")
-    
-    # Analyze answer lengths (shorter is usually better for GAIA)
-    answer_lengths = []
-    for result in results:
-        if result["success"] and result["result"]:
-            answer_lengths.append(len(str(result["result"])))
-    
-    if answer_lengths:
-        avg_length = sum(answer_lengths) / len(answer_lengths)
-        print(f"📏 Average Answer Length: {avg_length:.1f} characters")
-        print(f"📏 Answer Length Range: {min(answer_lengths)} - {max(answer_lengths)}")
-        
-        # Count concise answers (good sign)
-        concise_answers = len([l for l in answer_lengths if l <= 20])
-        print(f"✅ Concise Answers (≤20 chars): {concise_answers}/{len(answer_lengths)} ({(concise_answers/len(answer_lengths)*100):.1f}%)")
+    if total_questions:
+        print(f"📊 Success Rate: {(successful_answers/total_questions)*100:.1f}%")
+
+    if answered:
+        print(f"📏 Average Answer Length: {length_sum/answered:.1f} characters")
+        print(f"📏 Answer Length Range: {min_length} - {max_length}")
+        print(f"✅ Concise Answers (≤20 chars): {concise_answers}/{answered} ({(concise_answers/answered*100):.1f}%)")
     
     # Show some example answers
     print(f"\n📋 SAMPLE ANSWERS:")
     for i, result in enumerate(results[:5]):
         if result["success"]:
-            answer = str(result["result"])[:50] + "..." if len(str(result["result"])) > 50 else str(result["result"])
+            answer = result["result_str"]
+            if len(answer) > 50:
+                answer = answer[:50] + "..."
             print(f"   Q{i+1}: {answer}")
         else:
             print(f"   Q{i+1}: ERROR - {result['error']}")
@@ -185,13 +445,14 @@ def submit_results(username, agent_code_url, answers_payload):
         print("❌ No answers to submit!")
         return False
     
-    # Prepare submission data
-    submission_data = {
-        "username": username,
-        "agent_code": agent_code_url,
-        "answers": answers_payload
-    }
-    
+    # Assemble the body as bytes: the username/agent_code header is static,
+    # so only the answers list is serialized fresh
+    submission_body = (
+        b'{"username":' + _json_dumps_bytes(username) +
+        b',"agent_code":' + _json_dumps_bytes(agent_code_url) +
+        b',"answers":' + _json_dumps_bytes(answers_payload) + b'}'
+    )
+
     print(f"\n📤 Submitting {len(answers_payload)} answers to official GAIA API")
     print(f"👤 Username: {username}")
     print(f"🔗 Agent Code: {agent_code_url}")
@@ -200,9 +461,26 @@ def submit_results(username, agent_code_url, answers_payload):
     
     try:
         print("⏳ Submitting... (this may take a while)")
-        response = requests.post(submit_url, json=submission_data, timeout=120)
+        # Encode the body ourselves: orjson (when installed) serializes the
+        # answers list far faster than the stdlib encoder requests would use
+        body = gzip.compress(submission_body)
+        response = _retry(
+            SESSION.post, submit_url,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            timeout=120, **{_BODY_KWARG: body}
+        )
+        if 400 <= response.status_code < 500:
+            # The server may not decompress request bodies (FastAPI doesn't
+            # by default); this submission is too important to lose to a
+            # saved upload, so fall back to the plain body
+            print(f"⚠️  Gzip body rejected (HTTP {response.status_code}), resending uncompressed...")
+            response = _retry(
+                SESSION.post, submit_url,
+                headers={"Content-Type": "application/json"}, timeout=120,
+                **{_BODY_KWARG: submission_body}
+            )
         response.raise_for_status()
-        result_data = response.json()
+        result_data = _json_loads(response.content)
         
         print("\n🎉 SUBMISSION SUCCESSFUL!")
         print("=" * 40)
@@ -215,7 +493,7 @@ def submit_results(username, agent_code_url, answers_payload):
         
         return True
         
-    except requests.exceptions.HTTPError as e:
+    except _HTTP_STATUS_ERRORS as e:
         print(f"\n❌ SUBMISSION FAILED!")
         print(f"🔴 HTTP Error {e.response.status_code}")
         try:
@@ -225,12 +503,12 @@ def submit_results(username, agent_code_url, answers_payload):
             print(f"📋 Response: {e.response.text[:500]}")
         return False
         
-    except requests.exceptions.Timeout:
+    except _TIMEOUT_ERRORS:
         print(f"\n❌ SUBMISSION FAILED!")
         print(f"⏰ Request timed out (>2 minutes)")
         return False
-        
-    except requests.exceptions.RequestException as e:
+
+    except _REQUEST_ERRORS as e:
         print(f"\n❌ SUBMISSION FAILED!")
         print(f"🌐 Network error: {e}")
         return False
@@ -4,22 +4,98 @@ GAIA Custom Tools Module
 Contains all custom tools for the GAIA agent
 """
 
+import re
+import logging
+import functools
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any
-from smolagents import tool
-from PIL import Image
-from io import BytesIO
+from contextvars import ContextVar
+from smolagents import tool, VisitWebpageTool
+from cache_utils import cache_key, hash_text
 
-# Global variable for task context (shared with main agent)
-current_task_context = {}
+# Cap on webpage text fed back into the LLM context (characters)
+MAX_WEBPAGE_CHARS = 8000
+
+# Shared HTTP session: keep-alive + connection pooling means repeated file
+# downloads against the GAIA API reuse one TCP/TLS connection instead of
+# redoing the handshake per request; transient 5xx get a short retry
+_http_session = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+_http_session.mount("https://", _http_adapter)
+_http_session.mount("http://", _http_adapter)
+
+# Per-task context shared with the main agent. A ContextVar (rather than a
+# module-level dict) keeps each thread/async task's context isolated, so
+# concurrent solve_task calls don't read each other's task state.
+_task_context: ContextVar[Dict[str, Any]] = ContextVar("gaia_task_ctx", default={})
+
+# Lazy %s-style logging: messages are only formatted when the level is
+# enabled, unlike the old unconditional f-string prints
+log = logging.getLogger("gaia.tools")
+
+# Tools that are deterministic for a given set of arguments and therefore
+# safe to memoize within a task (avoids repeated network/IO round-trips
+# when the agent re-invokes a tool with identical arguments)
+MEMOIZABLE_TOOLS = {"reverse_text", "read_excel", "visit_webpage", "analyze_image", "transcribe_audio"}
+
+_memo_cache: Dict[str, Any] = {}
+_memo_lock = threading.Lock()
+
+def clear_memo_cache():
+    """Clear the tool memoization cache (call at the start of each task)"""
+    with _memo_lock:
+        _memo_cache.clear()
+
+def memoize_tool(tool_instance):
+    """Wrap a tool's forward() with result memoization if it's deterministic
+
+    Args:
+        tool_instance: A smolagents tool instance to wrap
+
+    Returns:
+        The same tool instance, with memoization applied when eligible
+    """
+    if tool_instance.name not in MEMOIZABLE_TOOLS:
+        return tool_instance
+
+    # Shared tool singletons may be wrapped once per Agent construction;
+    # don't stack multiple memoization layers
+    if getattr(tool_instance, '_memoized', False):
+        return tool_instance
+    tool_instance._memoized = True
+
+    original_forward = tool_instance.forward
+
+    def memoized_forward(*args, **kwargs):
+        key = f"{tool_instance.name}:{cache_key(args=args, kwargs=kwargs)}"
+        with _memo_lock:
+            if key in _memo_cache:
+                log.info("♻️  Reusing cached result for %s", tool_instance.name)
+                return _memo_cache[key]
+        result = original_forward(*args, **kwargs)
+        # Only cache successful results (tools return "Error ..." strings on failure)
+        if not (isinstance(result, str) and result.startswith("Error")):
+            with _memo_lock:
+                _memo_cache[key] = result
+        return result
+
+    tool_instance.forward = memoized_forward
+    return tool_instance
 
 @tool
 def get_task_context() -> str:
     """Get information about the current GAIA task"""
-    global current_task_context
+    current_task_context = _task_context.get()
     if not current_task_context:
         return "No task context available"
-    
+
     context_info = f"Task ID: {current_task_context.get('task_id', 'Unknown')}\n"
     context_info += f"Question: {current_task_context.get('Question', 'No question')}\n"
     context_info += f"File: {current_task_context.get('file_name', '')}\n"
@@ -32,11 +108,11 @@ def download_task_file(task_id: str) -> str:
     Args:
         task_id: The ID of the GAIA task to download files for
     """
-    global current_task_context
-    
+    current_task_context = _task_context.get()
+
     if not current_task_context.get('file_name'):
         return "No file associated with this task"
-    
+
     file_name = current_task_context['file_name']
     
     try:
@@ -44,37 +120,48 @@ def download_task_file(task_id: str) -> str:
         api_url = "https://agents-course-unit4-scoring.hf.space"
         file_url = f"{api_url}/files/{task_id}"
         
-        print(f"🔄 Attempting to download file: {file_name}")
-        print(f"📡 URL: {file_url}")
-        
-        response = requests.get(file_url, timeout=30)
+        log.info("🔄 Attempting to download file: %s", file_name)
+        log.debug("📡 URL: %s", file_url)
         
+        response = _http_session.get(file_url, timeout=30, stream=True)
+
         if response.status_code == 200:
-            # Save file locally
+            # Stream to disk in chunks instead of buffering the whole body
+            total_bytes = 0
             with open(file_name, 'wb') as f:
-                f.write(response.content)
-            print(f"✅ Downloaded: {file_name}")
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
+                    total_bytes += len(chunk)
+            log.info("✅ Downloaded: %s (%d bytes)", file_name, total_bytes)
             
             # If it's an image, try to process it
             if file_name.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
                 return f"Downloaded image file: {file_name}. Use analyze_image() to process it."
             else:
-                return f"Downloaded file: {file_name} ({len(response.content)} bytes)"
+                return f"Downloaded file: {file_name} ({total_bytes} bytes)"
         else:
             return f"Failed to download file: HTTP {response.status_code}"
             
     except Exception as e:
         return f"Error downloading file: {str(e)}"
 
+@functools.lru_cache(maxsize=256)
+def _reverse(text: str) -> str:
+    """Reverse a string, cached since the agent often re-reverses the same input"""
+    if len(text) > 4096 and text.isascii():
+        # Large ASCII input: reverse as bytes to use the C memmove path
+        return text.encode("ascii")[::-1].decode("ascii")
+    return text[::-1]
+
 @tool
 def reverse_text(text: str) -> str:
     """Reverse text to handle backwards questions
-    
+
     Args:
         text: The text to reverse
     """
-    reversed_text = text[::-1]
-    print(f"🔄 Reversed text: '{text}' -> '{reversed_text}'")
+    reversed_text = _reverse(text)
+    log.debug("🔄 Reversed text: '%s' -> '%s'", text, reversed_text)
     return reversed_text
 
 @tool
@@ -85,12 +172,11 @@ def analyze_image(image_path: str) -> str:
         image_path: Path to the image file to analyze
     """
     try:
-        # Load the image
+        # PIL is imported on first use so runs without image tasks skip it
+        from PIL import Image
+
+        # Image.open is lazy: only metadata below, so pixels are never decoded
         with Image.open(image_path) as img:
-            # Convert to RGB if needed
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
             # Basic image analysis
             width, height = img.size
             format_info = img.format if img.format else "Unknown"
@@ -109,6 +195,20 @@ def analyze_image(image_path: str) -> str:
     except Exception as e:
         return f"Error analyzing image {image_path}: {str(e)}"
 
+# The ASR pipeline costs seconds to import (transformers + torch) and to
+# instantiate; keep one loaded instance for all audio questions in a run
+_asr_pipeline = None
+_asr_lock = threading.Lock()
+
+def _get_asr_pipeline():
+    """Get the shared speech-recognition pipeline, loading it on first use"""
+    global _asr_pipeline
+    with _asr_lock:
+        if _asr_pipeline is None:
+            from transformers import pipeline
+            _asr_pipeline = pipeline("automatic-speech-recognition", model="facebook/wav2vec2-base-960h")
+        return _asr_pipeline
+
 @tool
 def transcribe_audio(file_path: str) -> str:
     """Transcribe an audio file to text using Hugging Face's ASR model.
@@ -116,8 +216,7 @@ def transcribe_audio(file_path: str) -> str:
         file_path: path to the audio file
     """
     try:
-        from transformers import pipeline
-        transcriber = pipeline("automatic-speech-recognition", model="facebook/wav2vec2-base-960h")
+        transcriber = _get_asr_pipeline()
         transcription = transcriber(file_path)
         return transcription["text"]
     except Exception as e:
@@ -154,39 +253,163 @@ def multiply(a: int, b: int) -> float:
     """
     return a * b
 
+class TrimmedVisitWebpageTool(VisitWebpageTool):
+    """VisitWebpageTool that trims its output before the LLM sees it
+
+    Full pages are often tens of KB of markdown; feeding all of it back
+    into the agent inflates prompt tokens on every subsequent step.
+    Collapse repeated blank lines and truncate to MAX_WEBPAGE_CHARS.
+    """
+
+    def forward(self, url: str) -> str:
+        content = super().forward(url)
+        if not isinstance(content, str):
+            return content
+        # Collapse runs of blank lines left behind by nav/boilerplate markup
+        content = re.sub(r'\n{3,}', '\n\n', content).strip()
+        if len(content) > MAX_WEBPAGE_CHARS:
+            content = content[:MAX_WEBPAGE_CHARS] + "\n\n[... page truncated ...]"
+        return content
+
+# Shared fetcher behind visit_webpages (keeps one HTTP session warm)
+_webpage_fetcher = None
+_webpage_fetcher_lock = threading.Lock()
+
+def get_webpage_fetcher() -> TrimmedVisitWebpageTool:
+    """Get the shared trimmed-webpage fetcher, creating it on first use"""
+    global _webpage_fetcher
+    with _webpage_fetcher_lock:
+        if _webpage_fetcher is None:
+            _webpage_fetcher = TrimmedVisitWebpageTool()
+        return _webpage_fetcher
+
+@tool
+def visit_webpages(urls: list) -> str:
+    """Fetch several webpages concurrently and return their content
+
+    Much faster than calling visit_webpage in a loop: pages are fetched
+    in parallel, so total time is roughly the slowest single fetch.
+
+    Args:
+        urls: List of page URLs to fetch (at most 5 are fetched)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    urls = list(urls)[:5]
+    if not urls:
+        return "No URLs provided"
+
+    fetcher = get_webpage_fetcher()
+
+    def _fetch(url: str) -> str:
+        try:
+            return fetcher.forward(url)
+        except Exception as e:
+            return f"Error fetching {url}: {str(e)}"
+
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        contents = list(executor.map(_fetch, urls))
+
+    return "\n\n".join(f"=== {url} ===\n{content}" for url, content in zip(urls, contents))
+
+class SearchCache:
+    """Persistent disk cache for search results, keyed by query hash
+
+    Identical queries recur both within a run (agent retries) and across
+    GAIA runs. Caching them skips the DuckDuckGo round-trip and its rate
+    limiting entirely. Entries expire after a TTL since search results
+    drift over time.
+    """
+
+    def __init__(self, path: str = ".search_cache.sqlite", ttl: float = 86400):
+        import sqlite3
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, result TEXT, ts REAL)"
+        )
+        self._conn.commit()
+
+    def _key(self, query: str) -> str:
+        return hash_text(query.lower().strip())
+
+    def get(self, query: str):
+        import time
+        row = self._conn.execute(
+            "SELECT result, ts FROM searches WHERE key = ?", (self._key(query),)
+        ).fetchone()
+        if row is not None and time.time() - row[1] < self.ttl:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, query: str, result: str):
+        import time
+        self._conn.execute(
+            "INSERT OR REPLACE INTO searches (key, result, ts) VALUES (?, ?, ?)",
+            (self._key(query), result, time.time())
+        )
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters for the search cache"""
+        return {"hits": self.hits, "misses": self.misses}
+
+# Shared across all rate-limited search wrappers
+search_cache = SearchCache()
+
 def create_rate_limited_search(search_tool, min_delay: float = 3.0):
     """Create a rate-limited search function to avoid DuckDuckGo blocks
-    
+
     Args:
         search_tool: The base search tool to wrap
         min_delay: Minimum delay between searches in seconds
     """
     import time
-    last_search_time = [0]  # Use list to make it mutable in closure
-    
+    pacer_lock = threading.Lock()
+    next_slot = [0.0]  # Monotonic time the next search may start
+
     def rate_limited_search(query: str) -> str:
         """Search with rate limiting to avoid DuckDuckGo blocks
-        
+
         Args:
             query: The search query string
         """
-        # Enforce delay between searches
-        current_time = time.time()
-        time_since_last = current_time - last_search_time[0]
-        if time_since_last < min_delay:
-            sleep_time = min_delay - time_since_last
-            print(f"⏳ Waiting {sleep_time:.1f}s to avoid rate limiting...")
-            time.sleep(sleep_time)
-        
-        print(f"🔍 Searching: {query}")
+        # "nocache:" prefix bypasses the disk cache for a fresh search
+        use_cache = not query.startswith("nocache:")
+        query = query.removeprefix("nocache:").strip()
+
+        if use_cache:
+            cached = search_cache.get(query)
+            if cached is not None:
+                log.info("♻️  Using cached search result for: %s", query)
+                return cached
+
+        # Reserve a start slot under the lock, then sleep outside it, so
+        # parallel workers queue up min_delay apart instead of all blocking
+        # on one sleeping thread (and cache hits above never wait at all)
+        with pacer_lock:
+            now = time.monotonic()
+            start_at = max(now, next_slot[0])
+            next_slot[0] = start_at + min_delay
+        wait = start_at - now
+        if wait > 0:
+            log.info("⏳ Waiting %.1fs to avoid rate limiting...", wait)
+            time.sleep(wait)
+
+        log.info("🔍 Searching: %s", query)
         try:
             result = search_tool(query)
-            last_search_time[0] = time.time()
+            if use_cache:
+                search_cache.put(query, str(result))
             return result
         except Exception as e:
-            print(f"❌ Search failed: {e}")
+            log.warning("❌ Search failed: %s", e)
             return f"Search failed: {str(e)}"
-    
+
     return rate_limited_search
 
 def get_all_custom_tools():
@@ -207,19 +430,17 @@ def get_all_custom_tools():
     ]
 
 def set_task_context(task_context: Dict[str, Any]):
-    """Set the global task context for tools to access
-    
+    """Set the task context for tools to access (isolated per thread/task)
+
     Args:
         task_context: The current task context dictionary
     """
-    global current_task_context
-    current_task_context = task_context
+    _task_context.set(task_context)
 
 def get_task_context_dict() -> Dict[str, Any]:
     """Get the current task context dictionary
-    
+
     Returns:
         The current task context
     """
-    global current_task_context
-    return current_task_context 
\ No newline at end of file
+    return _task_context.get() 
\ No newline at end of file